@@ -1,16 +1,15 @@
 import os
 import asyncio
+import functools
 import re
-import json
-from urllib.parse import urlparse
-from playwright.async_api import async_playwright
-import nest_asyncio
-import requests
+import time
+from pathlib import Path
+from browser_pool import build_proxy_config, get_context, close_browser, block_resources
+import httpx
+import orjson
 import random
 from datetime import datetime
 
-nest_asyncio.apply()
-
 # --- CONFIG ---
 proxy_url = os.environ.get("PROXY_HTTP")
 proxy2_url = os.environ.get("PROXY2_HTTP")
@@ -20,65 +19,113 @@ chat_id = os.environ.get("CHAT_ID")
 if not proxy_url or not proxy2_url or not telegram_key or not chat_id:
     raise ValueError("Missing environment variables: PROXY_HTTP, PROXY2_HTTP, TELEGRAM_KEY, or CHAT_ID")
 
-async def apply_stealth_techniques(page):
-    await page.add_init_script("""
-        Object.defineProperty(navigator, 'webdriver', { get: () => false });
-
-        Object.defineProperty(navigator, 'plugins', {
-            get: () => [
-                {name: 'Chrome PDF Plugin', description: 'Portable Document Format', filename: 'internal-pdf-viewer'},
-                {name: 'Chrome PDF Viewer', description: '', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai'},
-                {name: 'Native Client', description: '', filename: 'internal-nacl-plugin'}
-            ]
-        });
-
-        Object.defineProperty(navigator, 'languages', {
-            get: () => ['en-US', 'en']
-        });
-
-        window.navigator.chrome = {
-            runtime: {},
-            loadTimes: function() {},
-            csi: function() {},
-            app: {}
-        };
-
-        const originalQuery = window.navigator.permissions.query;
-        window.navigator.permissions.query = (parameters) => (
-            parameters.name === 'notifications'
-                ? Promise.resolve({ state: Notification.permission })
-                : originalQuery(parameters)
-        );
-
-        const getParameter = WebGLRenderingContext.prototype.getParameter;
-        WebGLRenderingContext.prototype.getParameter = function(parameter) {
-            if (parameter === 37445) return 'Intel Inc.';
-            if (parameter === 37446) return 'Intel Iris OpenGL Engine';
-            return getParameter.call(this, parameter);
-        };
-
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-
-        Object.defineProperty(screen, 'availWidth',  { get: () => 1920 });
-        Object.defineProperty(screen, 'availHeight', { get: () => 1080 });
-
-        const originalToString = Function.prototype.toString;
-        Function.prototype.toString = function() {
-            if (this === navigator.permissions.query) {
-                return 'function query() { [native code] }';
-            }
-            return originalToString.call(this);
-        };
-
-        Object.defineProperty(navigator, 'connection', {
-            get: () => ({ effectiveType: '4g', downlink: 10, rtt: 50 })
-        });
-
-        Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => 8 });
-        Object.defineProperty(navigator, 'deviceMemory', { get: () => 8 });
-    """)
+proxy_config = build_proxy_config(proxy_url)
+proxy2_config = build_proxy_config(proxy2_url)
+
+# Patterns used to pull APYs out of rendered page text
+RESERVOIR_APY_RE = re.compile(r'Current APY[:\s]*([\d.]+)%', re.IGNORECASE)
+LIUSD_WEEKS = ("1 week", "4 week", "8 week")
+# All week labels in one alternation so the body is scanned once; the gap between a
+# label and its APY is capped so a miss can't scan the whole page
+LIUSD_APY_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, LIUSD_WEEKS)) + r")s?\b[^%]{0,200}?([\d.]+)%",
+    re.IGNORECASE
+)
+
+# Injected into every page of a context before any site script runs
+BASIC_STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]});
+    Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
+    window.chrome = {runtime: {}};
+"""
+
+STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', { get: () => false });
+
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [
+            {name: 'Chrome PDF Plugin', description: 'Portable Document Format', filename: 'internal-pdf-viewer'},
+            {name: 'Chrome PDF Viewer', description: '', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai'},
+            {name: 'Native Client', description: '', filename: 'internal-nacl-plugin'}
+        ]
+    });
+
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en']
+    });
+
+    window.navigator.chrome = {
+        runtime: {},
+        loadTimes: function() {},
+        csi: function() {},
+        app: {}
+    };
+
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications'
+            ? Promise.resolve({ state: Notification.permission })
+            : originalQuery(parameters)
+    );
+
+    const getParameter = WebGLRenderingContext.prototype.getParameter;
+    WebGLRenderingContext.prototype.getParameter = function(parameter) {
+        if (parameter === 37445) return 'Intel Inc.';
+        if (parameter === 37446) return 'Intel Iris OpenGL Engine';
+        return getParameter.call(this, parameter);
+    };
+
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+    delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+
+    Object.defineProperty(screen, 'availWidth',  { get: () => 1920 });
+    Object.defineProperty(screen, 'availHeight', { get: () => 1080 });
+
+    const originalToString = Function.prototype.toString;
+    Function.prototype.toString = function() {
+        if (this === navigator.permissions.query) {
+            return 'function query() { [native code] }';
+        }
+        return originalToString.call(this);
+    };
+
+    Object.defineProperty(navigator, 'connection', {
+        get: () => ({ effectiveType: '4g', downlink: 10, rtt: 50 })
+    });
+
+    Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => 8 });
+    Object.defineProperty(navigator, 'deviceMemory', { get: () => 8 });
+"""
+
+# --- RESULT CACHE ---
+CACHE_DIR = Path("cache")
+CACHE_TTL = 3600  # seconds; APYs only move once per protocol epoch
+
+def ttl_cache(key, ttl=CACHE_TTL):
+    """Serve a fetcher's last complete result from disk until it is ttl seconds old"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            path = CACHE_DIR / f"{key}.json"
+            try:
+                cached = orjson.loads(path.read_bytes())
+                if time.time() < cached["expires_at"]:
+                    print(f"📦 Using cached {key}")
+                    return cached["value"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+            value = await func(*args, **kwargs)
+
+            # Don't cache misses so a failing source is retried on the next run
+            if value is not None and not (isinstance(value, dict) and None in value.values()):
+                CACHE_DIR.mkdir(exist_ok=True)
+                path.write_bytes(orjson.dumps({"value": value, "expires_at": time.time() + ttl}))
+            return value
+        return wrapper
+    return decorator
 
 def get_realistic_user_agents():
     return [
@@ -90,62 +137,61 @@ def get_realistic_user_agents():
     ]
 
 # --- SCRAPER FOR RESERVOIR ---
+@ttl_cache("reservoir")
 async def scrape_reservoir_apy():
-    async with async_playwright() as p:
-        parsed = urlparse(proxy_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
-        }
-
-        browser = await p.chromium.launch(headless=True, proxy=proxy_config)
-        page = await browser.new_page()
-
-        # Stealth
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]});
-            Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
-            window.chrome = {runtime: {}};
-        """)
+    # The shared browser is launched on first use, so a cache hit never starts Chromium
+    context = await get_context(proxy_config)
+    await block_resources(context)
+    await context.add_init_script(BASIC_STEALTH_JS)
+    page = await context.new_page()
 
+    try:
+        await page.goto(
+            "https://app.reservoir.xyz/mint?from=rUSD&fromNetwork=Ethereum&to=srUSDv2&toNetwork=Ethereum",
+            wait_until="domcontentloaded",
+            timeout=60000
+        )
         try:
-            await page.goto(
-                "https://app.reservoir.xyz/mint?from=rUSD&fromNetwork=Ethereum&to=srUSDv2&toNetwork=Ethereum",
-                wait_until="networkidle",
-                timeout=60000
+            await page.wait_for_function(
+                r"() => /Current APY[:\s]*[\d.]+%/i.test(document.body.innerText)",
+                timeout=30000
             )
-            await page.wait_for_timeout(5000)
-            content = await page.inner_text("body")
+        except Exception as e:
+            print(f"⚠️ Reservoir APY did not render: {e}")
 
-            match = re.search(r'Current APY[:\s]*([\d.]+)%', content, re.IGNORECASE)
-            if match:
-                return round(float(match.group(1)), 2)
-            return None
-        finally:
-            await browser.close()
+        content = await page.inner_text("body")
+
+        match = RESERVOIR_APY_RE.search(content)
+        if match:
+            return round(float(match.group(1)), 2)
+        return None
+    finally:
+        await context.close()
 
 # --- FETCH AVANT APY ---
-def fetch_avant_apy():
+@ttl_cache("avant")
+async def fetch_avant_apy(client):
     urls = {
         "savusd": "https://app.avantprotocol.com/api/apy/savusd",
         "avusdx": "https://app.avantprotocol.com/api/apy/avusdx"
     }
-    apys = {}
-    for key, url in urls.items():
+
+    async def fetch(url):
         try:
-            data = requests.get(url, timeout=10).json()
-            apys[key] = round(float(data.get("apy", 0)), 2)
+            data = orjson.loads((await client.get(url, timeout=10)).content)
+            return round(float(data.get("apy", 0)), 2)
         except:
-            apys[key] = None
-    return apys
+            return None
+
+    apys = await asyncio.gather(*(fetch(url) for url in urls.values()))
+    return dict(zip(urls, apys))
 
 # --- FETCH Midas APY ---
-def fetch_midas_apys():
+@ttl_cache("midas")
+async def fetch_midas_apys(client):
     url = "https://api-prod.midas.app/api/data/apys"
     try:
-        data = requests.get(url, timeout=10).json()
+        data = orjson.loads((await client.get(url, timeout=10)).content)
 
         return {
             "mhyper": round(float(data.get("mhyper", 0)) * 100, 2),
@@ -160,96 +206,83 @@ def fetch_midas_apys():
         }
 
 # --- FETCH YieldFi APY ---
-def fetch_yieldfi_apy():
+@ttl_cache("yieldfi")
+async def fetch_yieldfi_apy(client):
     urls = {
         "yusd": "https://ctrl.yield.fi/t/apy/yusd/apyHistory",
         "vyusd": "https://ctrl.yield.fi/t/apy/vyusd/apyHistory"
     }
-    apys = {}
-    for key, url in urls.items():
+
+    async def fetch(url):
         try:
-            data = requests.get(url, timeout=10).json()
-            apys[key] = round(float(data["apy_history"][0]["apy"]), 2)
+            data = orjson.loads((await client.get(url, timeout=10)).content)
+            return round(float(data["apy_history"][0]["apy"]), 2)
         except:
-            apys[key] = None
-    return apys
+            return None
+
+    apys = await asyncio.gather(*(fetch(url) for url in urls.values()))
+    return dict(zip(urls, apys))
 
 # --- SCRAPE Infinifi liUSD APY ---
+@ttl_cache("infinifi_liusd")
 async def scrape_infinifi_liusd():
-    async with async_playwright() as p:
-        parsed = urlparse(proxy2_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
-        }
-
-        user_agent = random.choice(get_realistic_user_agents())
-
-        browser = await p.chromium.launch(headless=True, proxy=proxy_config)
-        page = await browser.new_page(user_agent=user_agent, ignore_https_errors=True)
+    user_agent = random.choice(get_realistic_user_agents())
 
-        await apply_stealth_techniques(page)
+    context = await get_context(proxy2_config, user_agent=user_agent, ignore_https_errors=True)
+    await block_resources(context)
+    await context.add_init_script(STEALTH_JS)
+    page = await context.new_page()
 
+    try:
+        await page.goto("https://app.infinifi.xyz/lock", wait_until="domcontentloaded", timeout=60000)
         try:
-            await page.goto("https://app.infinifi.xyz/lock", wait_until="networkidle", timeout=60000)
-            await page.wait_for_timeout(5000)
+            await page.wait_for_function(
+                r"""() => {
+                    const text = document.body.innerText;
+                    return ['1 week', '4 week', '8 week'].every(
+                        week => new RegExp('\\b' + week + 's?\\b[^%]{0,200}?[\\d.]+%', 'i').test(text)
+                    );
+                }""",
+                timeout=30000
+            )
+        except Exception as e:
+            print(f"⚠️ Infinifi liUSD APYs did not render: {e}")
 
-            content = await page.inner_text("body")
+        content = await page.inner_text("body")
 
-            liusd = {}
-            for week in ["1 week", "4 week", "8 week"]:
-                pattern = rf"{week}.*?([\d.]+)%"
-                match = re.search(pattern, content, re.IGNORECASE | re.DOTALL)
-                liusd[week] = round(float(match.group(1)), 2) if match else None
+        liusd = dict.fromkeys(LIUSD_WEEKS)
+        for match in LIUSD_APY_RE.finditer(content):
+            week = match.group(1).lower()
+            if liusd[week] is None:
+                liusd[week] = round(float(match.group(2)), 2)
 
-            return liusd
+        return liusd
 
-        finally:
-            await browser.close()
+    finally:
+        await context.close()
 
 # --- FETCH Infinifi siUSD APY ---
+@ttl_cache("infinifi_siusd")
 async def fetch_infinifi_siusd():
-    async with async_playwright() as p:
-        parsed = urlparse(proxy_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
-        }
-        browser = await p.chromium.launch(headless=True, proxy=proxy_config)
-        page = await browser.new_page()
-
-        # Stealth
-        await page.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1,2,3,4,5]});
-            Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
-            window.chrome = {runtime: {}};
-        """)
-
-        try:
-            # Fetch the JSON directly from the API endpoint
-            await page.goto("https://eth-api.infinifi.xyz/api/protocol/data", wait_until="networkidle", timeout=60000)
-            content = await page.content()
-            
-            # Sometimes inner_text on "body" can truncate JSON, safer to use response text
-            response = await page.evaluate("() => document.body.innerText")
-            data = json.loads(response)
-
-            # Extract staked average7dAPY
-            average7dAPY = data.get("data", {}).get("stats", {}).get("staked", {}).get("average7dAPY")
-            if average7dAPY is not None:
-                return round(float(average7dAPY) * 100, 2)  # Convert to percentage
-            return None
-        except Exception as e:
-            print(f"❌ Error fetching Infinifi siUSD APY: {e}")
-            return None
-        finally:
-            await browser.close()
+    # Plain JSON endpoint, so no browser needed - just go through the same proxy
+    headers = {"User-Agent": get_realistic_user_agents()[0], "Accept": "application/json"}
+    try:
+        async with httpx.AsyncClient(timeout=15, headers=headers, proxy=proxy_url, follow_redirects=True) as client:
+            resp = await client.get("https://eth-api.infinifi.xyz/api/protocol/data")
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+
+        # Extract staked average7dAPY
+        average7dAPY = data.get("data", {}).get("stats", {}).get("staked", {}).get("average7dAPY")
+        if average7dAPY is not None:
+            return round(float(average7dAPY) * 100, 2)  # Convert to percentage
+        return None
+    except Exception as e:
+        print(f"❌ Error fetching Infinifi siUSD APY: {e}")
+        return None
 
 # --- TELEGRAM MESSAGE ---
-def send_telegram_message(reservoir_apy, avant_apys, midas_apys, yieldfi_apys, infinifi_siusd, infinifi_liusd):
+async def send_telegram_message(client, reservoir_apy, avant_apys, midas_apys, yieldfi_apys, infinifi_siusd, infinifi_liusd):
     today = datetime.now().strftime("%d %b %Y")
     lines = [f"<b>Competitor Report {today} 📊</b>\n"]
 
@@ -288,18 +321,38 @@ def send_telegram_message(reservoir_apy, avant_apys, midas_apys, yieldfi_apys, i
         "text": message,
         "parse_mode": "HTML"
     }
-    resp = requests.post(url, json=payload)
+    resp = await client.post(url, json=payload, timeout=10)
     if resp.status_code == 200:
         print("✅ Telegram message sent successfully!")
     else:
         print(f"❌ Telegram error: {resp.status_code} {resp.text}")
 
 # --- MAIN ---
+async def main():
+    # Every source is independent, so run them all at once; total time is the slowest one
+    async with httpx.AsyncClient(follow_redirects=True) as client:
+        # One Chromium process for every scrape, launched only if a scrape misses the cache
+        try:
+            (
+                reservoir_apy,
+                avant_apys,
+                midas_apys,
+                yieldfi_apys,
+                infinifi_siusd,
+                infinifi_liusd,
+            ) = await asyncio.gather(
+                scrape_reservoir_apy(),
+                fetch_avant_apy(client),
+                fetch_midas_apys(client),
+                fetch_yieldfi_apy(client),
+                fetch_infinifi_siusd(),
+                scrape_infinifi_liusd(),
+            )
+        finally:
+            await close_browser()
+
+        # Reuse the pooled client so the report doesn't open its own connection
+        await send_telegram_message(client, reservoir_apy, avant_apys, midas_apys, yieldfi_apys, infinifi_siusd, infinifi_liusd)
+
 if __name__ == "__main__":
-    reservoir_apy = asyncio.get_event_loop().run_until_complete(scrape_reservoir_apy())
-    avant_apys = fetch_avant_apy()
-    midas_apys = fetch_midas_apys()
-    yieldfi_apys = fetch_yieldfi_apy()
-    infinifi_siusd = asyncio.get_event_loop().run_until_complete(fetch_infinifi_siusd())
-    infinifi_liusd = asyncio.get_event_loop().run_until_complete(scrape_infinifi_liusd())
-    send_telegram_message(reservoir_apy, avant_apys, midas_apys, yieldfi_apys, infinifi_siusd, infinifi_liusd)
+    asyncio.run(main())
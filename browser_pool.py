@@ -0,0 +1,114 @@
+import os
+import asyncio
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright
+
+# One Chromium process per run, shared by every scraper; each job gets its own
+# BrowserContext, which is far cheaper to create than a browser.
+_playwright = None
+_browser = None
+_lock = asyncio.Lock()
+
+async def get_browser():
+    global _playwright, _browser
+    async with _lock:
+        if _browser is None:
+            _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(
+                headless=True,
+                args=[
+                    '--disable-blink-features=AutomationControlled',
+                    '--disable-dev-shm-usage',
+                    '--no-sandbox',
+                ],
+                ignore_default_args=['--enable-automation'],
+            )
+    return _browser
+
+def build_proxy_config(url):
+    parsed = urlparse(url)
+    return {
+        "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
+        "username": parsed.username,
+        "password": parsed.password
+    }
+
+async def get_context(proxy_config, **kwargs):
+    """Open a fresh context on the shared browser; callers close the context, not the browser"""
+    browser = await get_browser()
+    return await browser.new_context(proxy=proxy_config, **kwargs)
+
+async def close_browser():
+    global _playwright, _browser
+    async with _lock:
+        if _browser is not None:
+            await _browser.close()
+            await _playwright.stop()
+            _playwright = None
+            _browser = None
+
+# Set DEBUG_PROXY to print the proxy's exit IP before scraping
+DEBUG_PROXY = os.environ.get("DEBUG_PROXY")
+
+async def print_proxy_ip(context):
+    """Print the context's exit IP when DEBUG_PROXY is set; a plain request, no page render"""
+    if not DEBUG_PROXY:
+        return
+    try:
+        resp = await context.request.get("https://httpbin.org/ip", timeout=10000)
+        print(f"🌐 Proxy IP: {await resp.text()}")
+    except Exception as e:
+        print(f"⚠️ Could not verify proxy IP (non-critical): {e}")
+
+# We only read text and JSON, so skip heavy assets and trackers; stylesheets stay
+# because innerText line breaks, which the parsers split on, depend on layout
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+TRACKER_HOSTS = (
+    "googletagmanager.com",
+    "google-analytics.com",
+    "doubleclick.net",
+    "segment.io",
+    "segment.com",
+    "intercom.io",
+    "hotjar.com",
+    "mixpanel.com",
+    "sentry.io",
+)
+
+async def block_resources(context, allowed_types=None):
+    """Abort heavy assets and tracker requests; with allowed_types, abort every other resource type"""
+    async def handle(route):
+        request = route.request
+        if allowed_types is not None:
+            blocked = request.resource_type not in allowed_types
+        else:
+            blocked = request.resource_type in BLOCKED_RESOURCE_TYPES
+        if blocked or (urlparse(request.url).hostname or "").endswith(TRACKER_HOSTS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await context.route("**/*", handle)
+
+# Set DEBUG_ENDPOINTS to list the JSON endpoints each page loads
+DEBUG_ENDPOINTS = os.environ.get("DEBUG_ENDPOINTS")
+
+def record_json_endpoints(page):
+    """Collect the URLs of xhr/fetch JSON responses a page loads when DEBUG_ENDPOINTS is set"""
+    urls = []
+    if not DEBUG_ENDPOINTS:
+        return urls
+
+    def on_response(response):
+        if response.request.resource_type in ("xhr", "fetch") and "json" in response.headers.get("content-type", ""):
+            urls.append(response.url)
+
+    page.on("response", on_response)
+    return urls
+
+def print_json_endpoints(urls):
+    if not DEBUG_ENDPOINTS:
+        return
+    print(f"🔌 JSON endpoints loaded by the page ({len(urls)}):")
+    for url in dict.fromkeys(urls):
+        print(f"   {url}")
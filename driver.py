@@ -0,0 +1,41 @@
+import os
+import asyncio
+from browser_pool import close_browser
+from sheets_client import prefetch_date_columns
+from jupiter import run_jupiter
+from neutrl import run_neutrl
+from reservoir import run_reservoir
+from resolv import run_resolv
+
+SCRAPERS = (run_jupiter, run_neutrl, run_reservoir, run_resolv)
+SHEET_TITLES = ("Jupiter", "Neutrl", "Reservoir", "Resolv")
+MAX_CONCURRENT_SCRAPERS = 3  # browser contexts open at once through the proxy
+
+# The scrapers are network-bound, so run them side by side on one shared browser
+async def main():
+    # One batchGet finds every scraper's today-row instead of one read per worksheet;
+    # if it fails, each scraper reads its own sheet as before
+    try:
+        await asyncio.to_thread(prefetch_date_columns, os.environ["SHEET_ID"], SHEET_TITLES)
+    except Exception as e:
+        print(f"⚠️ Could not prefetch date columns, scrapers will read their own: {e}")
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCRAPERS)
+
+    async def bounded(run):
+        async with semaphore:
+            await run()
+
+    try:
+        results = await asyncio.gather(*(bounded(run) for run in SCRAPERS), return_exceptions=True)
+    finally:
+        await close_browser()
+
+    # Let every scraper finish even if another fails, then surface the failure; a
+    # cancelled or timed-out scraper (CancelledError is a BaseException) counts too
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,10 @@
 import os
 import asyncio
 import random
-from playwright.async_api import async_playwright
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import nest_asyncio
+from browser_pool import build_proxy_config, get_context, close_browser, block_resources, print_proxy_ip, record_json_endpoints, print_json_endpoints
+from sheets_client import open_worksheet, find_today_row
 import datetime
 import re
-import json
-from urllib.parse import urlparse
-
-nest_asyncio.apply()
 
 # Step 1: Authenticate with Google Sheets
 sa_json = os.environ.get("GOOGLEAPI")
@@ -20,223 +14,237 @@ proxy_url = os.environ.get("PROXY_HTTP")
 if not sa_json or not sheet_id:
     raise ValueError("Missing environment variables: GOOGLEAPI or SHEET_ID")
 
-creds = ServiceAccountCredentials.from_json_keyfile_dict(
-    json.loads(sa_json),
-    ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
-)
-client = gspread.authorize(creds)
-sheet = client.open_by_key(sheet_id).worksheet("Jupiter")
+PROXY_CONFIG = build_proxy_config(proxy_url)
+
+def open_sheet():
+    return open_worksheet(sheet_id, "Jupiter")
 
 # Step 2: Find or create today's row
 today = datetime.date.today()
 today_str = today.strftime("%d/%m/%Y")
-col_a = sheet.col_values(1)
-
-if today_str in col_a:
-    row_idx = col_a.index(today_str) + 1
-    if sheet.cell(row_idx, 2).value:
-        print("✅ Today's row already filled; exiting.")
-        exit()
-else:
-    row_idx = len(col_a) + 1
-    sheet.update(
-        values=[[today_str]],
-        range_name=f"A{row_idx}:A{row_idx}",
-        value_input_option="USER_ENTERED"
-    )
 
 # Step 3: Scraper
 async def scrape_jupiter_apr():
-    from pathlib import Path
-    from tempfile import TemporaryDirectory
-
-    async with async_playwright() as p:
-        parsed = urlparse(proxy_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
-        }
-
-        with TemporaryDirectory() as tmp_profile:
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=tmp_profile,
-                headless=True,
-                proxy=proxy_config,
-                ignore_https_errors=True,
-                viewport={"width": 1920, "height": 1080},
-                locale="en-US",
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    context = await get_context(
+        PROXY_CONFIG,
+        ignore_https_errors=True,
+        viewport={"width": 1920, "height": 1080},
+        locale="en-US",
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    )
+    await block_resources(context)
+    page = await context.new_page()
+
+    # With DEBUG_ENDPOINTS set, record the JSON endpoints the app loads its stats from
+    api_urls = record_json_endpoints(page)
+
+    try:
+        await print_proxy_ip(context)
+
+        print("📍 Navigating to Jupiter perps-earn...")
+        # The app keeps polling in the background, so wait for the stats rather than network idle
+        await page.goto("https://jup.ag/perps-earn", wait_until="domcontentloaded", timeout=60000)
+        try:
+            await page.wait_for_selector("text=Total Value Locked", timeout=30000)
+        except Exception as e:
+            print(f"⚠️ Stats did not render: {str(e)[:100]}")
+
+        print("📄 Checking page content...")
+        
+        # Try multiple selector strategies
+        clicked = False
+        selectors = [
+            "button.cursor-pointer",  # New button structure
+            "button:has-text('%')",
+            "p.cursor-pointer",       # Old structure as fallback
+            "p[class*='cursor']",
+            "[role='button']:has-text('%')"
+        ]
+        
+        for selector in selectors:
+            try:
+                print(f"🔍 Trying selector: {selector}")
+                await page.wait_for_selector(selector, timeout=5000)
+                elements = await page.query_selector_all(selector)
+                print(f"   Found {len(elements)} elements")
+                
+                for el in elements:
+                    txt = await el.inner_text()
+                    if "%" in txt:
+                        print(f"   ✅ Clicking element with text: {txt[:50]}")
+                        await el.click()
+                        clicked = True
+                        break
+                if clicked:
+                    break
+            except Exception as e:
+                print(f"   ⚠️ Selector failed: {str(e)[:100]}")
+                continue
+
+        if not clicked:
+            print("⚠️ Could not find clickable element, continuing anyway...")
+
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            # Wait for the USDT custody amount, the lowest of the fields we parse
+            await page.wait_for_function(
+                r"() => /[\d,]+\.\d{2}\s+USDT/.test(document.body.innerText)",
+                timeout=15000
             )
-            page = context.pages[0] if context.pages else await context.new_page()
+        except Exception as e:
+            print(f"⚠️ Custody values did not render: {str(e)[:100]}")
+
+        body_text = await page.inner_text("body")
+        print(f"📊 Retrieved {len(body_text)} characters")
+        print("=" * 80)
+        print("FIRST 2000 CHARACTERS OF PAGE:")
+        print("=" * 80)
+        print(body_text[:2000])
+        print("=" * 80)
+        print_json_endpoints(api_urls)
+        
+        return body_text
+
+    except Exception as e:
+        print(f"❌ Error during scraping: {e}")
+        raise
+    finally:
+        await context.close()
 
-            try:
-                await page.goto("https://httpbin.org/ip", wait_until="domcontentloaded")
-                print("🌐 Proxy IP content:")
-                print(await page.inner_text("body"))
+# Step 4: Parsing Helpers
+# Patterns run over the whole page text with re.M, so no per-line list is built
+DOLLAR_LINE_RE = re.compile(r"^[^\S\n]*\$[^\d.\n]*([\d.][\d.,]*)", re.M)
+NUMBER_LINE_RE = re.compile(r"^[^\d.\n]*([\d.][\d.,]*)", re.M)
+USDT_LINE_RE = re.compile(r"^[^\S\n]*[\d,]+\.\d{2}[^\S\n]+USDT[^\S\n]*$", re.M)
+# Field keyword -> pattern for the first line after it that holds its value
+FIELDS = {
+    "Total Value Locked": DOLLAR_LINE_RE,
+    "Wrapped SOL": DOLLAR_LINE_RE,
+    "Ether (Portal)": DOLLAR_LINE_RE,
+    "Wrapped BTC (Portal)": DOLLAR_LINE_RE,
+    "USD Coin": DOLLAR_LINE_RE,
+    "Total Supply": NUMBER_LINE_RE,
+    "JLP Price": DOLLAR_LINE_RE,
+    "APR": NUMBER_LINE_RE,
+}
+FIELD_KEYWORD_RE = re.compile("|".join(map(re.escape, FIELDS)))
+
+def extract_fields(text):
+    """Return the first number after each field keyword, found in one sweep over the page text"""
+    values = {}
+    for m in FIELD_KEYWORD_RE.finditer(text):
+        keyword = m.group(0)
+        if keyword in values:
+            continue
+        line_end = text.find("\n", m.end())
+        if line_end == -1:
+            break
+        value = FIELDS[keyword].search(text, line_end + 1)
+        values[keyword] = value.group(1).replace(",", "") if value else ""
+        if len(values) == len(FIELDS):
+            break
+    return values
+
+def extract_usdt_value(text):
+    # The USDT custody line has no keyword; its dollar value is the closest "$" line above it
+    for usdt in USDT_LINE_RE.finditer(text):
+        dollar_values = DOLLAR_LINE_RE.findall(text, 0, usdt.start())
+        if dollar_values:
+            return dollar_values[-1].replace(",", "")
+    return ""
 
-                print("📍 Navigating to Jupiter perps-earn...")
-                await page.goto("https://jup.ag/perps-earn", wait_until="networkidle", timeout=60000)
-                await page.wait_for_timeout(8000)
+# Steps 5-6: Extract Data and Calculate Ratios
+def parse_jupiter_stats(text):
+    """Pull the pool figures out of the page text, keyed by sheet column"""
+    print(f"\n📝 Total characters to search: {len(text)}")
 
-                print("📄 Checking page content...")
-                
-                # Try multiple selector strategies
-                clicked = False
-                selectors = [
-                    "button.cursor-pointer",  # New button structure
-                    "button:has-text('%')",
-                    "p.cursor-pointer",       # Old structure as fallback
-                    "p[class*='cursor']",
-                    "[role='button']:has-text('%')"
-                ]
-                
-                for selector in selectors:
-                    try:
-                        print(f"🔍 Trying selector: {selector}")
-                        await page.wait_for_selector(selector, timeout=5000)
-                        elements = await page.query_selector_all(selector)
-                        print(f"   Found {len(elements)} elements")
-                        
-                        for el in elements:
-                            txt = await el.inner_text()
-                            if "%" in txt:
-                                print(f"   ✅ Clicking element with text: {txt[:50]}")
-                                await el.click()
-                                clicked = True
-                                break
-                        if clicked:
-                            break
-                    except Exception as e:
-                        print(f"   ⚠️ Selector failed: {str(e)[:100]}")
-                        continue
-
-                if not clicked:
-                    print("⚠️ Could not find clickable element, continuing anyway...")
-
-                await page.wait_for_timeout(3000)
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(3000)
-
-                body_text = await page.inner_text("body")
-                print(f"📊 Retrieved {len(body_text)} characters")
-                print("=" * 80)
-                print("FIRST 2000 CHARACTERS OF PAGE:")
-                print("=" * 80)
-                print(body_text[:2000])
-                print("=" * 80)
-                
-                return body_text
+    # Step 5: Extract Data - with debug output
+    print("\n🔍 Searching for data fields...")
+    fields = extract_fields(text)
 
-            except Exception as e:
-                print(f"❌ Error during scraping: {e}")
-                raise
-            finally:
-                await context.close()
+    B_str = fields.get("Total Value Locked", "")
+    print(f"   Total Value Locked (B): {B_str if B_str else 'NOT FOUND'}")
 
-# Run scraper
-print("🚀 Starting scraper...")
-text = asyncio.get_event_loop().run_until_complete(scrape_jupiter_apr())
+    C_str = fields.get("Wrapped SOL", "")
+    print(f"   Wrapped SOL (C): {C_str if C_str else 'NOT FOUND'}")
 
-# Initialize lines
-lines = text.splitlines()
-print(f"\n📝 Total lines extracted: {len(lines)}")
+    E_str = fields.get("Ether (Portal)", "")
+    print(f"   Ether Portal (E): {E_str if E_str else 'NOT FOUND'}")
 
-# Step 4: Parsing Helpers
-def extract_after(keyword, lines, must_prefix=None):
-    for i, line in enumerate(lines):
-        if keyword in line:
-            for l in lines[i+1:]:
-                s = l.strip()
-                if not s: continue
-                if must_prefix and not s.startswith(must_prefix): continue
-                m = re.search(r"[\d.]+", s.replace(",", ""))
-                if m: return m.group(0)
-    return ""
+    G_str = fields.get("Wrapped BTC (Portal)", "")
+    print(f"   Wrapped BTC (G): {G_str if G_str else 'NOT FOUND'}")
 
-def extract_usdt_value(lines):
-    pattern = re.compile(r"^[\d,]+\.\d{2}\s+USDT$")
-    for i, line in enumerate(lines):
-        if pattern.match(line.strip()):
-            for j in range(i-1, -1, -1):
-                prev = lines[j].strip()
-                if prev.startswith("$"):
-                    match = re.search(r"[\d.]+", prev.replace(",", ""))
-                    if match:
-                        return match.group(0)
-    return ""
+    I_str = fields.get("USD Coin", "")
+    print(f"   USD Coin (I): {I_str if I_str else 'NOT FOUND'}")
 
-# Step 5: Extract Data - with debug output
-print("\n🔍 Searching for data fields...")
-
-B_str = extract_after("Total Value Locked", lines, must_prefix="$")
-print(f"   Total Value Locked (B): {B_str if B_str else 'NOT FOUND'}")
-
-C_str = extract_after("Wrapped SOL", lines, must_prefix="$")
-print(f"   Wrapped SOL (C): {C_str if C_str else 'NOT FOUND'}")
-
-E_str = extract_after("Ether (Portal)", lines, must_prefix="$")
-print(f"   Ether Portal (E): {E_str if E_str else 'NOT FOUND'}")
-
-G_str = extract_after("Wrapped BTC (Portal)", lines, must_prefix="$")
-print(f"   Wrapped BTC (G): {G_str if G_str else 'NOT FOUND'}")
-
-I_str = extract_after("USD Coin", lines, must_prefix="$")
-print(f"   USD Coin (I): {I_str if I_str else 'NOT FOUND'}")
-
-K_str = extract_usdt_value(lines)
-print(f"   USDT (K): {K_str if K_str else 'NOT FOUND'}")
-
-M_str = extract_after("Total Supply", lines)
-print(f"   Total Supply (M): {M_str if M_str else 'NOT FOUND'}")
-
-N_str = extract_after("JLP Price", lines, must_prefix="$")
-print(f"   JLP Price (N): {N_str if N_str else 'NOT FOUND'}")
-
-O_str = extract_after("APR", lines)
-print(f"   APR (O): {O_str if O_str else 'NOT FOUND'}")
-
-# Step 6: Convert and Calculate Ratios
-B = float(B_str) if B_str else 0.0
-C = float(C_str) if C_str else 0.0
-D = C/B if B else 0.0
-E = float(E_str) if E_str else 0.0
-F = E/B if B else 0.0
-G = float(G_str) if G_str else 0.0
-H = G/B if B else 0.0
-I = float(I_str) if I_str else 0.0
-J = I/B if B else 0.0
-K = float(K_str) if K_str else 0.0
-L = K/B if B else 0.0
-M = float(M_str.replace("JLP","").replace(",","").strip()) if M_str else 0.0
-N = float(N_str) if N_str else 0.0
-O = float(O_str) if O_str else 0.0
-
-print(f"\n📊 Calculated values:")
-print(f"   B (TVL): ${B:,.2f}")
-print(f"   C (SOL): ${C:,.2f} | D (ratio): {D:.4f}")
-print(f"   E (ETH): ${E:,.2f} | F (ratio): {F:.4f}")
-print(f"   G (BTC): ${G:,.2f} | H (ratio): {H:.4f}")
-print(f"   I (USDC): ${I:,.2f} | J (ratio): {J:.4f}")
-print(f"   K (USDT): ${K:,.2f} | L (ratio): {L:.4f}")
-print(f"   M (Supply): {M:,.2f}")
-print(f"   N (Price): ${N:.4f}")
-print(f"   O (APR): {O}%")
+    K_str = extract_usdt_value(text)
+    print(f"   USDT (K): {K_str if K_str else 'NOT FOUND'}")
 
-# Step 7: Write to Sheet
-col_map = {
-    2: B,  3: C,  4: D,  5: E,  6: F,
-    7: G,  8: H,  9: I, 10: J, 11: K,
-   12: L, 13: M, 14: N, 15: f"{O}%" if O else "",
-}
+    M_str = fields.get("Total Supply", "")
+    print(f"   Total Supply (M): {M_str if M_str else 'NOT FOUND'}")
 
-print(f"\n💾 Writing to sheet row {row_idx}...")
-for col_idx, val in col_map.items():
-    cell = f"{chr(64+col_idx)}{row_idx}"
-    sheet.update(
-        values=[[val]],
-        range_name=f"{cell}:{cell}",
-        value_input_option="USER_ENTERED"
+    N_str = fields.get("JLP Price", "")
+    print(f"   JLP Price (N): {N_str if N_str else 'NOT FOUND'}")
+
+    O_str = fields.get("APR", "")
+    print(f"   APR (O): {O_str if O_str else 'NOT FOUND'}")
+
+    # Step 6: Convert and Calculate Ratios
+    B, C, E, G, I, K, M, N, O = (
+        float(v) if v else 0.0
+        for v in (B_str, C_str, E_str, G_str, I_str, K_str, M_str, N_str, O_str)
     )
+    # Each asset's share of TVL
+    D, F, H, J, L = (x / B if B else 0.0 for x in (C, E, G, I, K))
+
+    print(f"\n📊 Calculated values:")
+    print(f"   B (TVL): ${B:,.2f}")
+    print(f"   C (SOL): ${C:,.2f} | D (ratio): {D:.4f}")
+    print(f"   E (ETH): ${E:,.2f} | F (ratio): {F:.4f}")
+    print(f"   G (BTC): ${G:,.2f} | H (ratio): {H:.4f}")
+    print(f"   I (USDC): ${I:,.2f} | J (ratio): {J:.4f}")
+    print(f"   K (USDT): ${K:,.2f} | L (ratio): {L:.4f}")
+    print(f"   M (Supply): {M:,.2f}")
+    print(f"   N (Price): ${N:.4f}")
+    print(f"   O (APR): {O}%")
+
+    return {
+        2: B,  3: C,  4: D,  5: E,  6: F,
+        7: G,  8: H,  9: I, 10: J, 11: K,
+       12: L, 13: M, 14: N, 15: f"{O}%" if O else "",
+    }
 
-print(f"✅ Row {row_idx} updated successfully!")
+# Step 7: Write to Sheet
+COLS = ("", *"ABCDEFGHIJKLMNOPQRSTUVWXYZ")  # 1-based column index -> letter
+def write_row(sheet, row_idx, col_map):
+    print(f"\n💾 Writing to sheet row {row_idx}...")
+    # One API call for the whole row instead of one per cell
+    sheet.batch_update(
+        [
+            {"range": f"{COLS[col_idx]}{row_idx}", "values": [[val]]}
+            for col_idx, val in {1: today_str, **col_map}.items()
+        ],
+        value_input_option="USER_ENTERED"
+    )
+    print(f"✅ Row {row_idx} updated successfully!")
+
+async def run_jupiter():
+    # gspread is blocking; run its calls in a thread so the other scrapers keep going
+    sheet = await asyncio.to_thread(open_sheet)
+    row_idx = await asyncio.to_thread(find_today_row, sheet, today_str)
+    if row_idx is None:
+        print("✅ Today's Jupiter row already filled; skipping.")
+        return
+
+    print("🚀 Starting scraper...")
+    text = await scrape_jupiter_apr()
+    await asyncio.to_thread(write_row, sheet, row_idx, parse_jupiter_stats(text))
+
+async def main():
+    try:
+        await run_jupiter()
+    finally:
+        await close_browser()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,15 +1,9 @@
 import os
 import asyncio
-import json
 import datetime
 import re
-from playwright.async_api import async_playwright
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import nest_asyncio
-from urllib.parse import urlparse
-
-nest_asyncio.apply()
+from browser_pool import build_proxy_config, get_context, close_browser, block_resources, print_proxy_ip, record_json_endpoints, print_json_endpoints
+from sheets_client import open_worksheet, find_today_row
 
 # Step 1: Authenticate with Google Sheets
 sa_json = os.environ.get("GOOGLEAPI")
@@ -19,320 +13,319 @@ proxy_url = os.environ.get("PROXY_HTTP")
 if not sa_json or not sheet_id:
     raise ValueError("Missing environment variables: GOOGLEAPI or SHEET_ID")
 
-creds = ServiceAccountCredentials.from_json_keyfile_dict(
-    json.loads(sa_json),
-    ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
-)
-client = gspread.authorize(creds)
-sheet = client.open_by_key(sheet_id).worksheet("Neutrl")
+PROXY_CONFIG = build_proxy_config(proxy_url)
+
+def open_sheet():
+    return open_worksheet(sheet_id, "Neutrl")
 
 # Step 2: Find or create today's row
 today = datetime.date.today()
 today_str = today.strftime("%d/%m/%Y")
-col_a = sheet.col_values(1)
-
-if today_str in col_a:
-    row_idx = col_a.index(today_str) + 1
-    if sheet.cell(row_idx, 2).value:
-        print("✅ Today's row already filled; exiting.")
-        exit()
-else:
-    row_idx = len(col_a) + 1
-    sheet.update(
-        values=[[today_str]],
-        range_name=f"A{row_idx}:A{row_idx}",
-        value_input_option="USER_ENTERED"
-    )
 
 # Step 3: Scraper
-async def scrape_neutrl_stats():
-    from tempfile import TemporaryDirectory
-
-    async with async_playwright() as p:
-        parsed = urlparse(proxy_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
+SCRAPE_TIMEOUT = 120  # seconds; firm deadline for the whole scrape, both pages included
+
+STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+    Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+    window.chrome = {runtime: {}};
+"""
+
+# Return the innerText of the smallest card (label's parent or a few levels up) that has a
+# number after the label, or null if there is none. Labels are found with one walk over
+# the text nodes, so no element's subtree text is built more than once.
+STAT_CARDS_JS = """(labels) => {
+    const found = new Map();
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node && found.size < labels.length; node = walker.nextNode()) {
+        const text = node.nodeValue.trim().toUpperCase();
+        if (labels.includes(text) && !found.has(text)) found.set(text, node.parentElement);
+    }
+    return labels.map((label) => {
+        const el = found.get(label);
+        for (let card = el && el.parentElement, depth = 0; card && depth < 4; card = card.parentElement, depth++) {
+            const text = card.innerText;
+            const at = text.toUpperCase().indexOf(label);
+            if (at >= 0 && /\\d/.test(text.slice(at + label.length))) return text;
         }
+        return null;
+    });
+}"""
+
+async def read_stat_cards(page, labels, parses):
+    """Read just the cards around labels; fall back to the whole body unless parses(lines) accepts them"""
+    cards = await page.evaluate(STAT_CARDS_JS, labels)
+    if all(cards):
+        text = "\n".join(cards)
+        if parses(text.splitlines()):
+            return text
+    print("⚠️ Stat cards not found; reading the whole page")
+    return await page.inner_text("body")
+
+def has_rewards_stats(lines):
+    hits = find_labels(lines)
+    return all(
+        extract_value_after_keyword(label, lines, hits, lookahead=5)[0]
+        for label in ("S1 REWARDS ISSUED", "TOTAL PARTICIPANTS")
+    )
+
+def has_total_supply(lines):
+    return extract_total_supply(lines, find_labels(lines))[0] is not None
 
-        with TemporaryDirectory() as tmp_profile:
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=tmp_profile,
-                headless=True,
-                proxy=proxy_config,
-                ignore_https_errors=True,
-                viewport={"width": 1920, "height": 1080},
-                locale="en-US",
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                ],
-                ignore_default_args=['--enable-automation'],
+async def scrape_neutrl_stats():
+    context = await get_context(
+        PROXY_CONFIG,
+        ignore_https_errors=True,
+        viewport={"width": 1920, "height": 1080},
+        locale="en-US",
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    )
+    # Registered on the context so every page and frame gets it
+    await context.add_init_script(STEALTH_JS)
+    # The stats are rendered by the app's scripts from its API calls; stylesheets stay so
+    # innerText keeps the line structure the parsers rely on
+    await block_resources(
+        context,
+        allowed_types={"document", "script", "xhr", "fetch", "stylesheet", "websocket", "eventsource"}
+    )
+    page = await context.new_page()
+
+    # With DEBUG_ENDPOINTS set, record the JSON endpoints (e.g. sentio) the app loads its stats from
+    api_urls = record_json_endpoints(page)
+
+    try:
+        await print_proxy_ip(context)
+
+        print("📍 Navigating to Neutrl rewards page...")
+        await page.goto("https://app.neutrl.fi/rewards", wait_until="domcontentloaded", timeout=60000)
+        
+        print("⏳ Waiting for rewards stats to load...")
+        try:
+            await page.wait_for_function(
+                r"""() => {
+                    const text = document.body.innerText;
+                    return /S1 Rewards Issued\D*\d/i.test(text)
+                        && /Total Participants\D*\d/i.test(text);
+                }""",
+                timeout=30000
+            )
+        except Exception as e:
+            print(f"⚠️ Rewards stats did not render: {e}")
+
+        print("📄 Extracting rewards page content...")
+        rewards_text = await read_stat_cards(page, ["S1 REWARDS ISSUED", "TOTAL PARTICIPANTS"], has_rewards_stats)
+        
+        # Now navigate to metrics page for TVL/NUSD Supply
+        print("\n📍 Navigating to Neutrl metrics page for NUSD Supply...")
+        await page.goto("https://app.neutrl.fi/metrics", wait_until="domcontentloaded", timeout=60000)
+        
+        print("⏳ Waiting for metrics to load...")
+        try:
+            await page.wait_for_function(
+                r"() => /(Total|NUSD) Supply[\s\S]{0,80}?\$\s*[\d,]+\.\d+/i.test(document.body.innerText)",
+                timeout=30000
             )
-            page = context.pages[0] if context.pages else await context.new_page()
-            
-            # Add stealth scripts
-            await page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-                Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
-                window.chrome = {runtime: {}};
-            """)
-
-            try:
-                try:
-                    print("🌐 Checking proxy IP...")
-                    await page.goto("https://httpbin.org/ip", wait_until="domcontentloaded", timeout=10000)
-                    proxy_ip = await page.inner_text("body")
-                    print(f"✅ Proxy IP: {proxy_ip}")
-                except Exception as e:
-                    print(f"⚠️ Could not verify proxy IP (non-critical): {e}")
-
-                print("📍 Navigating to Neutrl rewards page...")
-                await page.goto("https://app.neutrl.fi/rewards", wait_until="networkidle", timeout=60000)
-                
-                print("⏳ Waiting for initial content to load...")
-                await page.wait_for_timeout(3000)
-
-                # Scroll to ensure all content is loaded
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-                await page.evaluate("window.scrollTo(0, 0)")
-                await page.wait_for_timeout(2000)
-
-                print("📄 Extracting rewards page content...")
-                rewards_text = await page.inner_text("body")
-                
-                # Now navigate to metrics page for TVL/NUSD Supply
-                print("\n📍 Navigating to Neutrl metrics page for NUSD Supply...")
-                await page.goto("https://app.neutrl.fi/metrics", wait_until="networkidle", timeout=60000)
-                
-                print("⏳ Waiting for metrics to load...")
-                await page.wait_for_timeout(5000)
-                
-                # Scroll metrics page
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-                await page.evaluate("window.scrollTo(0, 0)")
-                await page.wait_for_timeout(2000)
-
-                print("📄 Extracting metrics page content...")
-                metrics_text = await page.inner_text("body")
-                print(f"📊 Retrieved {len(rewards_text)} characters from rewards page")
-                print(f"📊 Retrieved {len(metrics_text)} characters from metrics page")
-                print("=" * 80)
-                print("REWARDS PAGE (first 1000 chars):")
-                print("=" * 80)
-                print(rewards_text[:1000])
-                print("=" * 80)
-                print("METRICS PAGE (first 1000 chars):")
-                print("=" * 80)
-                print(metrics_text[:1000])
-                print("=" * 80)
-                
-                return rewards_text, metrics_text
-
-            except Exception as e:
-                print(f"❌ Error during scraping: {e}")
-                raise
-            finally:
-                await context.close()
-
-# Run scraper
-print("🚀 Starting Neutrl scraper...")
-rewards_text, metrics_text = asyncio.get_event_loop().run_until_complete(scrape_neutrl_stats())
-
-# Initialize lines from both pages
-rewards_lines = rewards_text.splitlines()
-metrics_lines = metrics_text.splitlines()
-print(f"\n📝 Rewards page: {len(rewards_lines)} lines")
-print(f"📝 Metrics page: {len(metrics_lines)} lines")
+        except Exception as e:
+            print(f"⚠️ Supply did not render: {e}")
+
+        print("📄 Extracting metrics page content...")
+        metrics_text = await read_stat_cards(page, ["TOTAL SUPPLY"], has_total_supply)
+        print(f"📊 Retrieved {len(rewards_text)} characters from rewards page")
+        print(f"📊 Retrieved {len(metrics_text)} characters from metrics page")
+        print("=" * 80)
+        print("REWARDS PAGE (first 1000 chars):")
+        print("=" * 80)
+        print(rewards_text[:1000])
+        print("=" * 80)
+        print("METRICS PAGE (first 1000 chars):")
+        print("=" * 80)
+        print(metrics_text[:1000])
+        print("=" * 80)
+        print_json_endpoints(api_urls)
+        
+        return rewards_text, metrics_text
+
+    except Exception as e:
+        print(f"❌ Error during scraping: {e}")
+        raise
+    finally:
+        await context.close()
 
 # Step 4: Extract Data
-def extract_value_after_keyword(keyword, lines, lookahead=10):
-    """
-    Find the keyword and look forward for a number.
-    lookahead: how many lines to search forward
-    """
+# A figure on its own line, with an optional $ and B/M/K suffix (e.g. "64.40B", "$123M", "1966")
+VALUE_AFTER_RE = re.compile(r"^[\$]?([\d.]+)([BMK]?)$")
+# Every label we look for on either page, so each page's lines are scanned once
+LABEL_RE = re.compile(r"S1 REWARDS ISSUED|TOTAL PARTICIPANTS|TOTAL SUPPLY|NUSD SUPPLY", re.IGNORECASE)
+SUPPLY_PERIODS = ("1 month", "1m")
+
+def find_labels(lines):
+    """Map each label (uppercased) to the lines it appears on, in a single pass"""
+    hits = {}
     for i, line in enumerate(lines):
-        if keyword.upper() in line.upper():
-            print(f"   Found keyword '{keyword}' at line {i}: {line}")
-            # Look forward for a number
-            for j in range(i + 1, min(len(lines), i + lookahead + 1)):
-                next_line = lines[j].strip()
-                # Remove commas and look for numbers (including decimals like 64.40B)
-                # Check for patterns like "64.40B" or "1966" or "63520224569.86"
-                cleaned = next_line.replace(",", "")
-                
-                # Match numbers with optional B/M/K suffix and dollar signs
-                match = re.match(r"^[\$]?([\d.]+)([BMK]?)$", cleaned)
-                if match:
-                    number_str = match.group(1)
-                    suffix = match.group(2)
-                    print(f"   Found value: {next_line} (number: {number_str}, suffix: {suffix})")
-                    return next_line, number_str, suffix
-    return None, None, None
+        for m in LABEL_RE.finditer(line):
+            label_lines = hits.setdefault(m.group(0).upper(), [])
+            if not label_lines or label_lines[-1] != i:
+                label_lines.append(i)
+    return hits
 
-def extract_value_before_keyword(keyword, lines, lookback=10):
+def extract_value_after_keyword(keyword, lines, hits, lookahead=10):
     """
-    Find the keyword and look backwards for a number.
-    lookback: how many lines to search backwards
+    Find the keyword and look forward for a number.
+    lookahead: how many lines to search forward
     """
-    for i, line in enumerate(lines):
-        if keyword.upper() in line.upper():
-            print(f"   Found keyword '{keyword}' at line {i}: {line}")
-            # Look backwards for a number
-            for j in range(max(0, i - lookback), i):
-                prev_line = lines[j].strip()
-                # Remove commas and dollar signs, look for numbers
-                cleaned = prev_line.replace(",", "").replace("$", "")
-                
-                # Match numbers with optional B/M/K suffix (e.g., $123M or 123M)
-                match = re.match(r"^([\d.]+)([BMK]?)$", cleaned)
-                if match:
-                    number_str = match.group(1)
-                    suffix = match.group(2)
-                    print(f"   Found value: {prev_line} (number: {number_str}, suffix: {suffix})")
-                    return prev_line, number_str, suffix
+    for i in hits.get(keyword, ()):
+        print(f"   Found keyword '{keyword}' at line {i}: {lines[i]}")
+        # Look forward for a number
+        for j in range(i + 1, min(len(lines), i + lookahead + 1)):
+            next_line = lines[j].strip()
+            # Remove commas and look for numbers (including decimals like 64.40B)
+            # Check for patterns like "64.40B" or "1966" or "63520224569.86"
+            cleaned = next_line.replace(",", "")
+
+            # Match numbers with optional B/M/K suffix and dollar signs
+            match = VALUE_AFTER_RE.match(cleaned)
+            if match:
+                number_str = match.group(1)
+                suffix = match.group(2)
+                print(f"   Found value: {next_line} (number: {number_str}, suffix: {suffix})")
+                return next_line, number_str, suffix
     return None, None, None
 
-def extract_total_supply(lines):
+def extract_supply_after(lines, i):
+    """Read a supply card below line i: a "1 month"/"1m" period line, then "$", then the number"""
+    for j in range(i + 1, min(len(lines), i + 10)):
+        if lines[j].strip().lower() in SUPPLY_PERIODS:
+            print(f"   Found time period '{lines[j].strip()}' at line {j}")
+            for k in range(j + 1, min(len(lines), j + 5)):
+                if lines[k].strip() == "$":
+                    print(f"   Found '$' at line {k}")
+                    if k + 1 < len(lines):
+                        value_line = lines[k + 1].strip()
+                        cleaned = value_line.replace(",", "")
+                        try:
+                            float(cleaned)
+                            print(f"   Found value: {value_line}")
+                            return value_line, cleaned, ""
+                        except ValueError:
+                            continue
+    return None
+
+def extract_total_supply(lines, hits):
     """
     Extract Total Supply value with multiple format support.
     Priority 1: TOTAL SUPPLY \n 1 month \n $ \n 137,625,703.19
     Priority 2: Total Supply \n 1m \n $ \n 137,698,261.09
     Priority 3: NUSD SUPPLY \n $123.81M (old format)
     """
-    # Try Priority 1: TOTAL SUPPLY (uppercase)
-    for i, line in enumerate(lines):
-        if line.strip().upper() == "TOTAL SUPPLY":
-            print(f"   Found 'TOTAL SUPPLY' at line {i}")
-            for j in range(i + 1, min(len(lines), i + 10)):
-                check_line = lines[j].strip().lower()
-                if check_line in ["1 month", "1m"]:
-                    print(f"   Found time period '{lines[j].strip()}' at line {j}")
-                    for k in range(j + 1, min(len(lines), j + 5)):
-                        if lines[k].strip() == "$":
-                            print(f"   Found '$' at line {k}")
-                            if k + 1 < len(lines):
-                                value_line = lines[k + 1].strip()
-                                cleaned = value_line.replace(",", "")
-                                try:
-                                    float(cleaned)
-                                    print(f"   Found value: {value_line}")
-                                    return value_line, cleaned, ""
-                                except:
-                                    continue
-    
-    # Try Priority 2: Total Supply (mixed case)
-    for i, line in enumerate(lines):
-        if "TOTAL SUPPLY" in line.strip().upper() and line.strip().upper() != "TOTAL SUPPLY":
-            print(f"   Found 'Total Supply' (mixed case) at line {i}")
-            for j in range(i + 1, min(len(lines), i + 10)):
-                check_line = lines[j].strip().lower()
-                if check_line in ["1 month", "1m"]:
-                    print(f"   Found time period '{lines[j].strip()}' at line {j}")
-                    for k in range(j + 1, min(len(lines), j + 5)):
-                        if lines[k].strip() == "$":
-                            print(f"   Found '$' at line {k}")
-                            if k + 1 < len(lines):
-                                value_line = lines[k + 1].strip()
-                                cleaned = value_line.replace(",", "")
-                                try:
-                                    float(cleaned)
-                                    print(f"   Found value: {value_line}")
-                                    return value_line, cleaned, ""
-                                except:
-                                    continue
-    
+    # Priorities 1 and 2: a line that is exactly TOTAL SUPPLY beats one that merely contains it
+    supply_lines = hits.get("TOTAL SUPPLY", [])
+    exact = [i for i in supply_lines if lines[i].strip().upper() == "TOTAL SUPPLY"]
+    mixed = [i for i in supply_lines if lines[i].strip().upper() != "TOTAL SUPPLY"]
+    for label, candidates in (("'TOTAL SUPPLY'", exact), ("'Total Supply' (mixed case)", mixed)):
+        for i in candidates:
+            print(f"   Found {label} at line {i}")
+            result = extract_supply_after(lines, i)
+            if result:
+                return result
+
     # Try Priority 3: Old NUSD SUPPLY format (fallback)
     print("   Trying old NUSD SUPPLY format...")
-    result = extract_value_after_keyword("NUSD SUPPLY", lines, lookahead=5)
+    result = extract_value_after_keyword("NUSD SUPPLY", lines, hits, lookahead=5)
     if result[0]:
         return result
     
     print("   TOTAL SUPPLY not found in any format")
     return None, None, None
 
+SUFFIX_MULTIPLIERS = {"": 1, "K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
 def convert_to_number(value_str, number_str, suffix):
     """Convert string with suffix (B/M/K) to actual number"""
     if not number_str:
         return 0
-    
-    num = float(number_str)
-    
-    # Apply multiplier based on suffix
-    if suffix == 'B':
-        num *= 1_000_000_000
-    elif suffix == 'M':
-        num *= 1_000_000
-    elif suffix == 'K':
-        num *= 1_000
-    
-    return num
-
-print("\n🔍 Searching for data fields...")
+    return float(number_str) * SUFFIX_MULTIPLIERS[suffix]
+
+def parse_neutrl_stats(rewards_text, metrics_text):
+    """Pull points, participants and supply out of the two pages' text"""
+    # Initialize lines from both pages
+    rewards_lines = rewards_text.splitlines()
+    metrics_lines = metrics_text.splitlines()
+    print(f"\n📝 Rewards page: {len(rewards_lines)} lines")
+    print(f"📝 Metrics page: {len(metrics_lines)} lines")
+    rewards_hits = find_labels(rewards_lines)
+    metrics_hits = find_labels(metrics_lines)
+
+    print("\n🔍 Searching for data fields...")
+
+    # Extract from REWARDS page
+    # Extract S1 Rewards Issued (Total Points) - look AFTER the keyword
+    rewards_str, rewards_num, rewards_suffix = extract_value_after_keyword("S1 REWARDS ISSUED", rewards_lines, rewards_hits, lookahead=5)
+    print(f"   S1 Rewards Issued (B): {rewards_str if rewards_str else 'NOT FOUND'}")
+
+    # Extract Total Participants - look AFTER the keyword
+    participants_str, participants_num, participants_suffix = extract_value_after_keyword("TOTAL PARTICIPANTS", rewards_lines, rewards_hits, lookahead=5)
+    print(f"   Total Participants (C): {participants_str if participants_str else 'NOT FOUND'}")
+
+    # Extract from METRICS page
+    # Extract NUSD Supply - look AFTER the keyword (format: NUSD Supply \n $123.81M)
+    print("\n🔍 Extracting Total Supply from metrics page...")
+    nusd_str, nusd_num, nusd_suffix = extract_total_supply(metrics_lines, metrics_hits)
+    print(f"   Total Supply (D): {nusd_str if nusd_str else 'NOT FOUND'}")
+
+    if not nusd_str:
+        print("\n⚠️ Total Supply not found. Showing metrics page content:")
+        print("=" * 80)
+        print(metrics_text[:2000])
+        print("=" * 80)
+
+    # Step 5: Convert to numbers
+    total_points = convert_to_number(rewards_str, rewards_num, rewards_suffix)
+    participants = int(float(participants_num)) if participants_num else 0
+    nusd_supply = convert_to_number(nusd_str, nusd_num, nusd_suffix)
+
+    print(f"\n📊 Calculated values:")
+    print(f"   Total Points (B): {total_points:,.2f}")
+    print(f"   Participants (C): {participants:,}")
+    print(f"   NUSD Supply (D): {nusd_supply:,.2f}")
+
+    return total_points, participants, nusd_supply
 
-# Extract from REWARDS page
-# Extract S1 Rewards Issued (Total Points) - look AFTER the keyword
-rewards_str, rewards_num, rewards_suffix = extract_value_after_keyword("S1 REWARDS ISSUED", rewards_lines, lookahead=5)
-print(f"   S1 Rewards Issued (B): {rewards_str if rewards_str else 'NOT FOUND'}")
-
-# Extract Total Participants - look AFTER the keyword
-participants_str, participants_num, participants_suffix = extract_value_after_keyword("TOTAL PARTICIPANTS", rewards_lines, lookahead=5)
-print(f"   Total Participants (C): {participants_str if participants_str else 'NOT FOUND'}")
-
-# Extract from METRICS page
-# Extract NUSD Supply - look AFTER the keyword (format: NUSD Supply \n $123.81M)
-print("\n🔍 Extracting Total Supply from metrics page...")
-nusd_str, nusd_num, nusd_suffix = extract_total_supply(metrics_lines)
-print(f"   Total Supply (D): {nusd_str if nusd_str else 'NOT FOUND'}")
-
-if not nusd_str:
-    print("\n⚠️ Total Supply not found. Showing metrics page content:")
-    print("=" * 80)
-    print(metrics_text[:2000])
-    print("=" * 80)
-
-# Step 5: Convert to numbers
-total_points = convert_to_number(rewards_str, rewards_num, rewards_suffix)
-participants = int(float(participants_num)) if participants_num else 0
-nusd_supply = convert_to_number(nusd_str, nusd_num, nusd_suffix)
+# Step 6: Write to Sheet
+def write_row(sheet, row_idx, total_points, participants, nusd_supply):
+    print(f"\n💾 Writing to sheet row {row_idx}...")
 
-print(f"\n📊 Calculated values:")
-print(f"   Total Points (B): {total_points:,.2f}")
-print(f"   Participants (C): {participants:,}")
-print(f"   NUSD Supply (D): {nusd_supply:,.2f}")
+    # Write date, Total Points, Participants and NUSD Supply (A:D) in one call
+    sheet.update(
+        values=[[today_str, total_points, participants, nusd_supply]],
+        range_name=f"A{row_idx}:D{row_idx}",
+        value_input_option="USER_ENTERED"
+    )
 
-# Step 6: Write to Sheet
-print(f"\n💾 Writing to sheet row {row_idx}...")
-
-# Write Total Points to column B
-sheet.update(
-    values=[[total_points]],
-    range_name=f"B{row_idx}:B{row_idx}",
-    value_input_option="USER_ENTERED"
-)
-
-# Write Participants to column C
-sheet.update(
-    values=[[participants]],
-    range_name=f"C{row_idx}:C{row_idx}",
-    value_input_option="USER_ENTERED"
-)
-
-# Write NUSD Supply to column D
-sheet.update(
-    values=[[nusd_supply]],
-    range_name=f"D{row_idx}:D{row_idx}",
-    value_input_option="USER_ENTERED"
-)
-
-print(f"✅ Row {row_idx} updated successfully!")
-print(f"   Date: {today_str}")
-print(f"   Total Points: {total_points:,.2f}")
-print(f"   Participants: {participants:,}")
-print(f"   NUSD Supply: {nusd_supply:,.2f}")
+    print(f"✅ Row {row_idx} updated successfully!")
+    print(f"   Date: {today_str}")
+    print(f"   Total Points: {total_points:,.2f}")
+    print(f"   Participants: {participants:,}")
+    print(f"   NUSD Supply: {nusd_supply:,.2f}")
+
+async def run_neutrl():
+    # gspread is blocking; run its calls in a thread so the other scrapers keep going
+    sheet = await asyncio.to_thread(open_sheet)
+    row_idx = await asyncio.to_thread(find_today_row, sheet, today_str)
+    if row_idx is None:
+        print("✅ Today's Neutrl row already filled; skipping.")
+        return
+
+    print("🚀 Starting Neutrl scraper...")
+    async with asyncio.timeout(SCRAPE_TIMEOUT):
+        rewards_text, metrics_text = await scrape_neutrl_stats()
+    await asyncio.to_thread(write_row, sheet, row_idx, *parse_neutrl_stats(rewards_text, metrics_text))
+
+async def main():
+    try:
+        await run_neutrl()
+    finally:
+        await close_browser()
+
+if __name__ == "__main__":
+    asyncio.run(main())
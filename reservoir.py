@@ -1,15 +1,9 @@
 import os
 import asyncio
-import json
 import datetime
 import re
-from playwright.async_api import async_playwright
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import nest_asyncio
-from urllib.parse import urlparse
-
-nest_asyncio.apply()
+from browser_pool import build_proxy_config, get_context, close_browser, block_resources, print_proxy_ip, record_json_endpoints, print_json_endpoints
+from sheets_client import open_worksheet, find_today_row
 
 # Step 1: Authenticate with Google Sheets
 sa_json = os.environ.get("GOOGLEAPI")
@@ -19,170 +13,175 @@ proxy_url = os.environ.get("PROXY_HTTP")
 if not sa_json or not sheet_id:
     raise ValueError("Missing environment variables: GOOGLEAPI or SHEET_ID")
 
-creds = ServiceAccountCredentials.from_json_keyfile_dict(
-    json.loads(sa_json),
-    ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
-)
-client = gspread.authorize(creds)
-sheet = client.open_by_key(sheet_id).worksheet("Reservoir")
+PROXY_CONFIG = build_proxy_config(proxy_url)
+
+def open_sheet():
+    return open_worksheet(sheet_id, "Reservoir")
 
 # Step 2: Find or create today's row
 today = datetime.date.today()
 today_str = today.strftime("%d/%m/%Y")
-col_a = sheet.col_values(1)
-
-if today_str in col_a:
-    row_idx = col_a.index(today_str) + 1
-    if sheet.cell(row_idx, 2).value:
-        print("✅ Today's row already filled; exiting.")
-        exit()
-else:
-    row_idx = len(col_a) + 1
-    sheet.update(
-        values=[[today_str]],
-        range_name=f"A{row_idx}:A{row_idx}",
-        value_input_option="USER_ENTERED"
-    )
 
 # Step 3: Scraper
+SCRAPE_TIMEOUT = 90  # seconds; firm deadline for the whole scrape, above the goto + consent + readiness waits
+
 async def scrape_reservoir_stats():
-    from tempfile import TemporaryDirectory
-
-    async with async_playwright() as p:
-        parsed = urlparse(proxy_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
-        }
-
-        with TemporaryDirectory() as tmp_profile:
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=tmp_profile,
-                headless=True,
-                proxy=proxy_config,
-                ignore_https_errors=True,
-                viewport={"width": 1920, "height": 1080},
-                locale="en-US",
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    context = await get_context(
+        PROXY_CONFIG,
+        ignore_https_errors=True,
+        viewport={"width": 1920, "height": 1080},
+        locale="en-US",
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    )
+    # Default blocklist keeps stylesheets; the readiness check and the participants
+    # lookback both depend on the rendered line breaks
+    await block_resources(context)
+    page = await context.new_page()
+
+    # With DEBUG_ENDPOINTS set, record the JSON endpoints the leaderboard loads its stats from
+    api_urls = record_json_endpoints(page)
+
+    try:
+        await print_proxy_ip(context)
+
+        print("📍 Navigating to Reservoir leaderboard...")
+        await page.goto("https://app.reservoir.xyz/leaderboard", wait_until="domcontentloaded", timeout=45000)
+        print("✅ Initial page loaded!")
+
+        # Wait for and click the "I understand" button if it appears
+        try:
+            print("🔘 Looking for consent button...")
+            await page.click('text="I understand"', timeout=8000)
+            print("✅ Clicked 'I understand' button")
+        except Exception as e:
+            print(f"⚠️ No consent button found: {e}")
+
+        print("⏳ Waiting for leaderboard stats to load...")
+        try:
+            # Both figures sit above their label, participants on the line right before it
+            await page.wait_for_function(
+                r"""() => {
+                    const text = document.body.innerText;
+                    return /\d[\s\S]{0,300}Points Earned in Season 3/i.test(text)
+                        && /\d\s*\n\s*Total Participants/i.test(text);
+                }""",
+                timeout=30000
             )
-            page = context.pages[0] if context.pages else await context.new_page()
-
-            try:
-                try:
-                    print("🌐 Checking proxy IP...")
-                    await page.goto("https://httpbin.org/ip", wait_until="domcontentloaded", timeout=10000)
-                    proxy_ip = await page.inner_text("body")
-                    print(f"✅ Proxy IP: {proxy_ip}")
-                except Exception as e:
-                    print(f"⚠️ Could not verify proxy IP (non-critical): {e}")
-
-                print("📍 Navigating to Reservoir leaderboard...")
-                await page.goto("https://app.reservoir.xyz/leaderboard", wait_until="domcontentloaded", timeout=90000)
-                print("✅ Initial page loaded!")
-
-                await page.wait_for_timeout(10000)
-
-                # Wait for and click the "I understand" button if it appears
-                try:
-                    print("🔘 Looking for consent button...")
-                    await page.wait_for_selector('text="I understand"', timeout=8000)
-                    await page.click('text="I understand"')
-                    print("✅ Clicked 'I understand' button")
-                    await page.wait_for_timeout(5000)
-                except Exception as e:
-                    print(f"⚠️ No consent button found: {e}")
-
-                print("⏳ Waiting for dynamic content to load...")
-                await page.wait_for_timeout(10000)
-
-                print("📄 Checking page content...")
-                
-                # Scroll to ensure content is loaded
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(3000)
-                await page.evaluate("window.scrollTo(0, 0)")
-                await page.wait_for_timeout(2000)
-
-                body_text = await page.inner_text("body")
-                print(f"📊 Retrieved {len(body_text)} characters")
-                print("=" * 80)
-                print("FIRST 3000 CHARACTERS OF PAGE:")
-                print("=" * 80)
-                print(body_text[:3000])
-                print("=" * 80)
-                
-                return body_text
-
-            except Exception as e:
-                print(f"❌ Error during scraping: {e}")
-                raise
-            finally:
-                await context.close()
-
-# Run scraper
-print("🚀 Starting scraper...")
-text = asyncio.get_event_loop().run_until_complete(scrape_reservoir_stats())
-
-# Initialize lines
-lines = text.splitlines()
-print(f"\n📝 Total lines extracted: {len(lines)}")
+        except Exception as e:
+            print(f"⚠️ Leaderboard stats did not render: {e}")
+
+        print("📄 Checking page content...")
+        body_text = await page.inner_text("body")
+        print(f"📊 Retrieved {len(body_text)} characters")
+        print("=" * 80)
+        print("FIRST 3000 CHARACTERS OF PAGE:")
+        print("=" * 80)
+        print(body_text[:3000])
+        print("=" * 80)
+        print_json_endpoints(api_urls)
+        
+        return body_text
+
+    except Exception as e:
+        print(f"❌ Error during scraping: {e}")
+        raise
+    finally:
+        await context.close()
 
 # Step 4: Extract Data
-def extract_value_before_keyword(keyword, lines, lookback=5):
-    """
-    Find the keyword and look backwards for a number.
-    lookback: how many lines to search backwards
-    """
-    for i, line in enumerate(lines):
-        if keyword.upper() in line.upper():
-            print(f"   Found keyword '{keyword}' at line {i}: {line}")
-            # Look backwards for a number
-            for j in range(max(0, i - lookback), i):
-                prev_line = lines[j].strip()
-                # Remove commas and look for numbers
-                cleaned = prev_line.replace(",", "")
-                if re.match(r"^\d+$", cleaned):
-                    print(f"   Found value: {prev_line}")
-                    return cleaned
-    return ""
-
-print("\n🔍 Searching for data fields...")
-
-# Extract Points Earned in Season 3
-points_str = extract_value_before_keyword("POINTS EARNED IN SEASON 3", lines, lookback=10)
-print(f"   Points Earned (B): {points_str if points_str else 'NOT FOUND'}")
-
-# Extract Total Participants - only look back 2 lines to avoid picking up points
-participants_str = extract_value_before_keyword("TOTAL PARTICIPANTS", lines, lookback=2)
-print(f"   Total Participants (C): {participants_str if participants_str else 'NOT FOUND'}")
-
-# Step 5: Convert to numbers
-points = int(points_str) if points_str else 0
-participants = int(participants_str) if participants_str else 0
-
-print(f"\n📊 Calculated values:")
-print(f"   Points (B): {points:,}")
-print(f"   Participants (C): {participants:,}")
+INTEGER_RE = re.compile(r"^\d+$")
+# Label -> how many lines above it to search for its figure; participants only look
+# back 2 lines to avoid picking up points
+LOOKBACK = {
+    "POINTS EARNED IN SEASON 3": 10,
+    "TOTAL PARTICIPANTS": 2,
+}
+LABEL_RE = re.compile("|".join(map(re.escape, LOOKBACK)), re.IGNORECASE)
+
+def extract_values_before_labels(text):
+    """Return the first whole number above each label, found in one sweep over the text"""
+    values = {}
+    for m in LABEL_RE.finditer(text):
+        label = m.group(0).upper()
+        if label in values:
+            continue
+        line_start = text.rfind("\n", 0, m.start()) + 1
+        line_end = text.find("\n", m.end())
+        print(f"   Found keyword '{label}': {text[line_start:line_end if line_end != -1 else None]}")
+
+        # Step back over the lookback window, then take its first number line
+        window_start = line_start
+        for _ in range(LOOKBACK[label]):
+            if window_start == 0:
+                break
+            window_start = text.rfind("\n", 0, window_start - 1) + 1
+        for prev_line in text[window_start:line_start].split("\n"):
+            cleaned = prev_line.strip().replace(",", "")
+            if INTEGER_RE.match(cleaned):
+                print(f"   Found value: {prev_line.strip()}")
+                values[label] = cleaned
+                break
+    return values
+
+def parse_reservoir_stats(text):
+    """Pull points and participants out of the leaderboard text"""
+    print(f"\n📝 Total characters to search: {len(text)}")
+
+    print("\n🔍 Searching for data fields...")
+    values = extract_values_before_labels(text)
+
+    # Extract Points Earned in Season 3
+    points_str = values.get("POINTS EARNED IN SEASON 3", "")
+    print(f"   Points Earned (B): {points_str if points_str else 'NOT FOUND'}")
+
+    # Extract Total Participants
+    participants_str = values.get("TOTAL PARTICIPANTS", "")
+    print(f"   Total Participants (C): {participants_str if participants_str else 'NOT FOUND'}")
+
+    # Step 5: Convert to numbers
+    points = int(points_str) if points_str else 0
+    participants = int(participants_str) if participants_str else 0
+
+    print(f"\n📊 Calculated values:")
+    print(f"   Points (B): {points:,}")
+    print(f"   Participants (C): {participants:,}")
+
+    return points, participants
 
 # Step 6: Write to Sheet
-print(f"\n💾 Writing to sheet row {row_idx}...")
-
-# Write Points to column B
-sheet.update(
-    values=[[points]],
-    range_name=f"B{row_idx}:B{row_idx}",
-    value_input_option="USER_ENTERED"
-)
-
-# Write Participants to column C
-sheet.update(
-    values=[[participants]],
-    range_name=f"C{row_idx}:C{row_idx}",
-    value_input_option="USER_ENTERED"
-)
-
-print(f"✅ Row {row_idx} updated successfully!")
-print(f"   Date: {today_str}")
-print(f"   Points: {points:,}")
-print(f"   Participants: {participants:,}")
+def write_row(sheet, row_idx, points, participants):
+    print(f"\n💾 Writing to sheet row {row_idx}...")
+
+    # Write date, Points and Participants (A:C) in one call
+    sheet.update(
+        values=[[today_str, points, participants]],
+        range_name=f"A{row_idx}:C{row_idx}",
+        value_input_option="USER_ENTERED"
+    )
+
+    print(f"✅ Row {row_idx} updated successfully!")
+    print(f"   Date: {today_str}")
+    print(f"   Points: {points:,}")
+    print(f"   Participants: {participants:,}")
+
+async def run_reservoir():
+    # gspread is blocking; run its calls in a thread so the other scrapers keep going
+    sheet = await asyncio.to_thread(open_sheet)
+    row_idx = await asyncio.to_thread(find_today_row, sheet, today_str)
+    if row_idx is None:
+        print("✅ Today's Reservoir row already filled; skipping.")
+        return
+
+    print("🚀 Starting scraper...")
+    async with asyncio.timeout(SCRAPE_TIMEOUT):
+        text = await scrape_reservoir_stats()
+    await asyncio.to_thread(write_row, sheet, row_idx, *parse_reservoir_stats(text))
+
+async def main():
+    try:
+        await run_reservoir()
+    finally:
+        await close_browser()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,18 +1,10 @@
 import os
 import asyncio
-import json
-from playwright.async_api import async_playwright
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import nest_asyncio
+import orjson
+from browser_pool import build_proxy_config, get_context, close_browser, print_proxy_ip
+from retry import with_retries
+from sheets_client import open_worksheet, find_today_row
 import datetime
-from urllib.parse import urlparse
-
-nest_asyncio.apply()
-
-# Configuration
-MAX_RETRIES = 3
-RETRY_DELAY = 2  # seconds between retries
 
 # Step 1: Authenticate with Google Sheets
 sa_json = os.environ.get("GOOGLEAPI")
@@ -22,138 +14,88 @@ proxy_url = os.environ.get("PROXY_HTTP")
 if not sa_json or not sheet_id:
     raise ValueError("Missing environment variables: GOOGLEAPI or SHEET_ID")
 
-creds = ServiceAccountCredentials.from_json_keyfile_dict(
-    json.loads(sa_json),
-    ['https://spreadsheets.google.com/feeds','https://www.googleapis.com/auth/drive']
-)
-client = gspread.authorize(creds)
-sheet = client.open_by_key(sheet_id).worksheet("Resolv")
+PROXY_CONFIG = build_proxy_config(proxy_url)
+
+def open_sheet():
+    return open_worksheet(sheet_id, "Resolv")
 
 # Step 2: Find or create today's row
 today = datetime.date.today()
 today_str = today.strftime("%d/%m/%Y")
-col_a = sheet.col_values(1)
-
-if today_str in col_a:
-    row_idx = col_a.index(today_str) + 1
-    if sheet.cell(row_idx, 2).value:
-        print("✅ Today's row already filled; exiting.")
-        exit()
-else:
-    row_idx = len(col_a) + 1
-    sheet.update(
-        values=[[today_str]],
-        range_name=f"A{row_idx}:A{row_idx}",
-        value_input_option="USER_ENTERED"
-    )
 
-# Step 3: Retry wrapper function
-async def with_retries(func, *args, **kwargs):
-    """Execute function with retry logic"""
-    last_exception = None
-    
-    for attempt in range(MAX_RETRIES):
-        try:
-            print(f"🔄 Attempt {attempt + 1}/{MAX_RETRIES}")
-            return await func(*args, **kwargs)
-        except Exception as e:
-            last_exception = e
-            print(f"❌ Attempt {attempt + 1} failed: {str(e)}")
-            
-            if attempt < MAX_RETRIES - 1:  # Don't sleep on last attempt
-                print(f"⏳ Waiting {RETRY_DELAY}s before retry...")
-                await asyncio.sleep(RETRY_DELAY)
-            else:
-                print("🚫 All retries exhausted")
-    
-    raise last_exception
-
-# Step 4: Scraper function
+# Step 3: Scraper function
 async def scrape_resolv_stats():
-    from pathlib import Path
-    from tempfile import TemporaryDirectory
-
-    async with async_playwright() as p:
-        parsed = urlparse(proxy_url)
-        proxy_config = {
-            "server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
-            "username": parsed.username,
-            "password": parsed.password
-        }
-
-        with TemporaryDirectory() as tmp_profile:
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir=tmp_profile,
-                headless=True,
-                proxy=proxy_config,
-                ignore_https_errors=True,
-                viewport={"width": 1920, "height": 1080},
-                locale="en-US",
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    context = await get_context(
+        PROXY_CONFIG,
+        ignore_https_errors=True,
+        viewport={"width": 1920, "height": 1080},
+        locale="en-US",
+        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    )
+
+    try:
+        # Step 4: Print the proxy IP (only with DEBUG_PROXY set)
+        await print_proxy_ip(context)
+
+        # Step 5: Fetch Resolv stats with retry
+        # The endpoint returns raw JSON, so request it through the context instead of rendering a page
+        async def get_resolv_stats():
+            response = await context.request.get(
+                "https://web-api.resolv.xyz/points/stats",
+                timeout=30000
             )
-            
-            try:
-                # Step 5: Verify proxy connection with retry
-                async def verify_proxy():
-                    page = context.pages[0] if context.pages else await context.new_page()
-                    await page.goto("https://httpbin.org/ip", wait_until="domcontentloaded")
-                    proxy_info = await page.inner_text("body")
-                    print("🌐 Proxy IP content:")
-                    print(proxy_info)
-                    return page
-                
-                page = await with_retries(verify_proxy)
-
-                # Step 6: Fetch Resolv stats with retry
-                async def get_resolv_stats():
-                    await page.goto(
-                        "https://web-api.resolv.xyz/points/stats",
-                        wait_until="domcontentloaded",
-                        timeout=30000
-                    )
-                    await page.wait_for_timeout(1000)
-                    
-                    pre_element = await page.query_selector("pre")
-                    if not pre_element:
-                        # Debug output
-                        page_title = await page.title()
-                        page_content = await page.content()
-                        print(f"🔍 Page title: {page_title}")
-                        print(f"🔍 Page content preview: {page_content[:300]}...")
-                        raise Exception("No <pre> element found - API might be blocked or changed")
-                        
-                    json_text = await pre_element.inner_text()
-                    data = json.loads(json_text.strip())
-                    
-                    total_users = data.get("totalUsers")
-                    total_points = data.get("totalPoints")
-                    
-                    if total_users is None or total_points is None:
-                        raise Exception("Missing totalUsers or totalPoints in response")
-                    
-                    print(f"📊 Fetched stats: {total_users:,} users, {total_points:,} points")
-                    return total_users, total_points
-                
-                total_users, total_points = await with_retries(get_resolv_stats)
-                print(f"✅ Scraping complete: {total_users:,} users, {total_points:,} points")
-                
-                return total_users, total_points
-
-            finally:
-                await context.close()
-
-# Step 7: Run scraper with retries
-async def main():
+            if not response.ok:
+                # Debug output
+                body = await response.text()
+                print(f"🔍 Response preview: {body[:300]}...")
+                raise Exception(f"Stats request failed with HTTP {response.status} - API might be blocked or changed")
+
+            data = orjson.loads(await response.body())
+
+            total_users = data.get("totalUsers")
+            total_points = data.get("totalPoints")
+
+            if total_users is None or total_points is None:
+                raise Exception("Missing totalUsers or totalPoints in response")
+
+            print(f"📊 Fetched stats: {total_users:,} users, {total_points:,} points")
+            return total_users, total_points
+
+        total_users, total_points = await with_retries(get_resolv_stats)
+        print(f"✅ Scraping complete: {total_users:,} users, {total_points:,} points")
+
+        return total_users, total_points
+
+    finally:
+        await context.close()
+
+# Step 6: Run scraper with retries
+async def run_resolv():
+    # gspread is blocking; run its calls in a thread so the other scrapers keep going
+    sheet = await asyncio.to_thread(open_sheet)
+    row_idx = await asyncio.to_thread(find_today_row, sheet, today_str)
+    if row_idx is None:
+        print("✅ Today's Resolv row already filled; skipping.")
+        return
+
     total_users, total_points = await with_retries(scrape_resolv_stats)
-    
-    # Step 8: Write to Sheet (both columns at once)
-    sheet.update(
-        values=[[total_users, total_points]],
-        range_name=f"B{row_idx}:C{row_idx}",
+
+    # Step 7: Write to Sheet (date and both columns at once)
+    await asyncio.to_thread(
+        sheet.update,
+        values=[[today_str, total_users, total_points]],
+        range_name=f"A{row_idx}:C{row_idx}",
         value_input_option="USER_ENTERED"
     )
-    
+
     print(f"✅ Row {row_idx} updated with {total_users:,} users and {total_points:,} points.")
 
+async def main():
+    try:
+        await run_resolv()
+    finally:
+        await close_browser()
+
 # Run the main function
-asyncio.get_event_loop().run_until_complete(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import asyncio
+import random
+
+# Configuration
+MAX_RETRIES = 3
+RETRY_DELAY = 2  # base delay in seconds, doubled on each retry
+MAX_RETRY_DELAY = 30
+
+def backoff_delay(attempt, base=RETRY_DELAY, retry_after=None):
+    """Exponential backoff with jitter, or the server's Retry-After when it sends one"""
+    if retry_after:
+        try:
+            return min(MAX_RETRY_DELAY, float(retry_after))
+        except ValueError:
+            pass
+    return min(MAX_RETRY_DELAY, base * 2 ** attempt) + random.uniform(0, base)
+
+async def with_retries(func, *args, **kwargs):
+    """Execute function with retry logic"""
+    last_exception = None
+
+    for attempt in range(MAX_RETRIES):
+        try:
+            print(f"🔄 Attempt {attempt + 1}/{MAX_RETRIES}")
+            return await func(*args, **kwargs)
+        except Exception as e:
+            last_exception = e
+            print(f"❌ Attempt {attempt + 1} failed: {str(e)}")
+
+            if attempt < MAX_RETRIES - 1:  # Don't sleep on last attempt
+                delay = backoff_delay(attempt)
+                print(f"⏳ Waiting {delay:.1f}s before retry...")
+                await asyncio.sleep(delay)
+            else:
+                print("🚫 All retries exhausted")
+
+    raise last_exception
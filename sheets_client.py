@@ -0,0 +1,60 @@
+import os
+import functools
+import threading
+import orjson
+import gspread
+
+# open_by_key goes through the Sheets API only, so Drive access isn't needed
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+# Authorize and open the spreadsheet once per process, so scrapers run together
+# from driver.py share one token exchange and one metadata fetch.
+@functools.lru_cache(maxsize=None)
+def get_client():
+    return gspread.service_account_from_dict(orjson.loads(os.environ["GOOGLEAPI"]), scopes=SCOPES)
+
+@functools.lru_cache(maxsize=None)
+def get_spreadsheet(sheet_id):
+    return get_client().open_by_key(sheet_id)
+
+# Scrapers open their sheets from worker threads; lru_cache alone would let them race to authorize
+_lock = threading.Lock()
+
+def open_worksheet(sheet_id, title):
+    with _lock:
+        spreadsheet = get_spreadsheet(sheet_id)
+    return spreadsheet.worksheet(title)
+
+# Worksheet title -> its A:B rows, filled by prefetch_date_columns and used once each
+_prefetched_rows = {}
+
+def prefetch_date_columns(sheet_id, titles):
+    """Read A:B of several worksheets in one batchGet so find_today_row needn't read each"""
+    with _lock:
+        spreadsheet = get_spreadsheet(sheet_id)
+    resp = spreadsheet.values_batch_get([f"'{title}'!A:B" for title in titles])
+    for title, value_range in zip(titles, resp.get("valueRanges", [])):
+        _prefetched_rows[title] = value_range.get("values", [])
+
+def locate_today_row(rows, today_str):
+    """Return the row for today's values in already-read A:B rows, or None if it's already filled"""
+    # Rows are appended daily, so today's row (if any) is at the bottom; scan upwards once
+    row_idx = next(
+        (i for i in range(len(rows), 0, -1) if rows[i - 1] and rows[i - 1][0] == today_str),
+        None
+    )
+
+    if row_idx:
+        if len(rows[row_idx - 1]) > 1 and rows[row_idx - 1][1]:
+            return None
+        return row_idx
+    # Nothing is written until the scrape succeeds; the date goes in with the values
+    return len(rows) + 1
+
+def find_today_row(sheet, today_str):
+    """Return the row for today's values, or None if it's already filled"""
+    # Read dates and the first value column in one call (or take a prefetched copy) and check the row locally
+    rows = _prefetched_rows.pop(sheet.title, None)
+    if rows is None:
+        rows = sheet.get("A:B")
+    return locate_today_row(rows, today_str)